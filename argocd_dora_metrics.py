@@ -10,12 +10,25 @@ Generates DORA (DevOps Research and Assessment) metrics from ArgoCD:
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
-from datetime import datetime, timedelta
-from collections import defaultdict
+from datetime import datetime
+from collections import Counter
 import csv
 import sys
+import bisect
+import shelve
+import statistics
+import threading
 from typing import Dict, List, Any
+from concurrent.futures import ThreadPoolExecutor
+
+from dora_scan import scan_history
+
+try:
+    import orjson  # Optional: much faster JSON decoding/encoding
+except ImportError:
+    orjson = None
 
 # Configuration
 ARGOCD_CLUSTERS = {
@@ -32,6 +45,21 @@ ARGOCD_CLUSTERS = {
 # Time range for analysis (default: last 30 days)
 DAYS_TO_ANALYZE = 30
 
+# Number of parallel threads used to fetch application history
+MAX_WORKERS = 20
+
+# Write buffer for report files (json.dump and csv issue many small writes)
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+# Optional on-disk cache of ArgoCD responses, revalidated with ETag /
+# Last-Modified. Off by default: it stores full Application documents as
+# pickles and is never pruned. Set a path prefix (e.g. '.argocd_http_cache')
+# to enable it; one file per cluster is created with this prefix.
+HTTP_CACHE_FILE = None
+
+# dbm picks its backend lazily on first open, which is not thread-safe
+_http_cache_open_lock = threading.Lock()
+
 # DORA Performance Levels
 DORA_LEVELS = {
     'deployment_frequency': {
@@ -61,6 +89,49 @@ DORA_LEVELS = {
 }
 
 
+def load_json(content: bytes) -> Any:
+    """Decode an ArgoCD API response body"""
+    if orjson:
+        return orjson.loads(content)
+    return json.loads(content)
+
+# Operation phases that mark an application as degraded
+FAILED_PHASES = frozenset({'Failed', 'Error'})
+
+# Level lookup tables for bisect: a value below THRESHOLDS[i] gets LABELS[i]
+LEVEL_LABELS = ('elite', 'high', 'medium', 'low')
+LEAD_TIME_THRESHOLDS = (1, 24, 168)  # hours: 1 hour, 1 day, 1 week
+MTTR_THRESHOLDS = (1, 24, 168)  # hours: 1 hour, 1 day, 1 week
+CHANGE_FAILURE_RATE_THRESHOLDS = (15, 30, 45)  # percent
+
+# Deployment frequency is higher-is-better: deploys per day for once a month/week/day
+DEPLOYMENT_FREQUENCY_THRESHOLDS = (1 / 30, 1 / 7, 1)
+DEPLOYMENT_FREQUENCY_LABELS = ('low', 'medium', 'high', 'elite')
+
+# Scores used to average the four metric levels into an overall level
+LEVEL_SCORES = {'elite': 4, 'high': 3, 'medium': 2, 'low': 1, 'unknown': 0}
+LEVEL_UPPER = {level: level.upper() for level in LEVEL_SCORES}
+
+# Overall level for an average score: 1.5 and up is MEDIUM, 2.5 HIGH, 3.5 ELITE
+OVERALL_THRESHOLDS = (1.5, 2.5, 3.5)
+OVERALL_LABELS = ('LOW', 'MEDIUM', 'HIGH', 'ELITE')
+
+
+# Summary CSV layout: (row label, metric key, value field)
+CSV_HEADER = ['Metric', 'Value', 'DORA Level', 'Description']
+CSV_SUMMARY_ROWS = (
+    ('Deployment Frequency (per day)', 'deployment_frequency', 'deployments_per_day'),
+    ('Lead Time (hours)', 'lead_time_for_changes', 'avg_lead_time_hours'),
+    ('Change Failure Rate (%)', 'change_failure_rate', 'change_failure_rate'),
+    ('MTTR (hours)', 'mean_time_to_recovery', 'avg_mttr_hours'),
+)
+
+
+def classify_level(value: float, thresholds: tuple, labels: tuple = LEVEL_LABELS) -> str:
+    """Map a metric value to its DORA level"""
+    return labels[bisect.bisect_right(thresholds, value)]
+
+
 class ArgocdDoraMetrics:
     def __init__(self, cluster_name: str, argocd_url: str, token: str):
         self.cluster_name = cluster_name
@@ -70,90 +141,161 @@ class ArgocdDoraMetrics:
             'Authorization': f'Bearer {token}',
             'Content-Type': 'application/json'
         }
+        self._app_cache = {}
+        
+        # Reuse TCP/TLS connections across all API calls for this cluster
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.verify = False
+        adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Conditional-GET cache: url -> (etag, last_modified, body)
+        self._http_cache = None
+        if HTTP_CACHE_FILE:
+            with _http_cache_open_lock:
+                self._http_cache = shelve.open(f'{HTTP_CACHE_FILE}_{cluster_name}')
+        self._http_cache_lock = threading.Lock()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """Close pooled HTTP connections and the response cache"""
+        self.session.close()
+        if self._http_cache is not None:
+            self._http_cache.close()
+            self._http_cache = None
+    
+    def _get(self, url: str) -> bytes:
+        """GET a URL, reusing the cached body when the server answers 304 Not Modified"""
+        if self._http_cache is None:
+            response = self.session.get(url)
+            response.raise_for_status()
+            return response.content
+        
+        with self._http_cache_lock:
+            cached = self._http_cache.get(url)
+        
+        headers = {}
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        
+        response = self.session.get(url, headers=headers)
+        if response.status_code == 304 and cached:
+            return cached[2]
+        response.raise_for_status()
+        
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            with self._http_cache_lock:
+                self._http_cache[url] = (etag, last_modified, response.content)
+        return response.content
         
     def get_applications(self) -> List[Dict]:
         """Fetch all applications from ArgoCD"""
         try:
             url = f'{self.argocd_url}/api/v1/applications'
-            response = requests.get(url, headers=self.headers, verify=False)
-            response.raise_for_status()
-            return response.json().get('items', [])
+            return load_json(self._get(url)).get('items', [])
         except Exception as e:
             print(f"Error fetching applications from {self.cluster_name}: {e}")
             return []
     
-    def get_application_history(self, app_name: str) -> List[Dict]:
-        """Fetch deployment history for an application"""
+    def prefetch_applications(self, apps_data: List[Dict]):
+        """Fetch every application in parallel and cache the full documents"""
+        app_names = [app.get('metadata', {}).get('name', 'unknown') for app in apps_data]
+        
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            app_documents = executor.map(self.fetch_application, app_names)
+            self._app_cache = dict(zip(app_names, app_documents))
+    
+    def get_application(self, app_name: str) -> Dict:
+        """Get an application document, fetching it only once"""
+        if app_name not in self._app_cache:
+            self._app_cache[app_name] = self.fetch_application(app_name)
+        return self._app_cache[app_name]
+    
+    def fetch_application(self, app_name: str) -> Dict:
+        """Fetch a single application document from ArgoCD"""
         try:
             url = f'{self.argocd_url}/api/v1/applications/{app_name}'
-            response = requests.get(url, headers=self.headers, verify=False)
-            response.raise_for_status()
-            
-            app_data = response.json()
-            history = app_data.get('status', {}).get('history', [])
-            return history
+            return load_json(self._get(url))
         except Exception as e:
-            print(f"Error fetching history for {app_name}: {e}")
-            return []
+            print(f"[{self.cluster_name}] Error fetching history for {app_name}: {e}")
+            return {}
+    
+    def get_application_history(self, app_name: str) -> List[Dict]:
+        """Get deployment history for an application"""
+        return self.get_application(app_name).get('status', {}).get('history', [])
     
     def get_operation_state(self, app_name: str) -> Dict:
         """Get current operation state of application"""
-        try:
-            url = f'{self.argocd_url}/api/v1/applications/{app_name}'
-            response = requests.get(url, headers=self.headers, verify=False)
-            response.raise_for_status()
-            
-            app_data = response.json()
-            return app_data.get('status', {}).get('operationState', {})
-        except Exception as e:
-            return {}
+        return self.get_application(app_name).get('status', {}).get('operationState', {})
     
-    def calculate_deployment_frequency(self, apps_data: List[Dict]) -> Dict:
+    def scan_application_history(self, app_name: str, start_ts: int, end_ts: int) -> Dict:
+        """
+        Scan an application's history once, collecting the data
+        needed by all four DORA metrics
+        """
+        history = self.get_application_history(app_name)
+        
+        # Operation state is per application (current state, not historical)
+        operation_state = self.get_operation_state(app_name)
+        is_degraded = operation_state.get('phase') in FAILED_PHASES
+        
+        deployments, deployment_days, gaps = scan_history(history, start_ts, end_ts)
+        
+        return {
+            'app_name': app_name,
+            'deployments': deployments,
+            'deployment_days': deployment_days,
+            # Lead time needs Git commit timestamps - ideally you'd query Git directly
+            # For now, use a placeholder; in production, integrate with Git API
+            'lead_times': [0] * len(deployments),
+            # If next deployment was within 1 hour, consider it a failure
+            'failures': len([gap for gap in gaps if gap < 3600]),
+            'degraded': len(deployments) if is_degraded else 0,
+            # Deployments close together (<1 hour) are likely a fix
+            'recovery_times': [gap / 3600 for gap in gaps if 0 < gap < 3600]
+        }
+    
+    def calculate_deployment_frequency(self, app_results: List[Dict]) -> Dict:
         """
         Calculate Deployment Frequency (DORA Metric 1)
         Number of deployments per day/week/month
         """
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=DAYS_TO_ANALYZE)
-        
-        deployment_counts = defaultdict(int)
-        app_deployment_counts = defaultdict(int)
-        daily_deployments = defaultdict(int)
+        total_deployments = 0
+        app_deployment_counts = Counter()
+        daily_deployments = Counter()
         
-        for app in apps_data:
-            app_name = app.get('metadata', {}).get('name', 'unknown')
-            history = self.get_application_history(app_name)
+        for result in app_results:
+            app_total = len(result['deployments'])
+            if not app_total:
+                continue
             
-            for deployment in history:
-                deployed_at_str = deployment.get('deployedAt')
-                if not deployed_at_str:
-                    continue
-                
-                # Parse deployment timestamp
-                deployed_at = datetime.strptime(deployed_at_str, '%Y-%m-%dT%H:%M:%SZ')
-                
-                if start_date <= deployed_at <= end_date:
-                    deployment_counts['total'] += 1
-                    app_deployment_counts[app_name] += 1
-                    
-                    # Track daily deployments
-                    day_key = deployed_at.strftime('%Y-%m-%d')
-                    daily_deployments[day_key] += 1
-        
-        total_deployments = deployment_counts['total']
+            total_deployments += app_total
+            app_deployment_counts[result['app_name']] += app_total
+            
+            # Track daily deployments (Counter.update counts the whole list in C)
+            daily_deployments.update(result['deployment_days'])
+        
         deployments_per_day = total_deployments / DAYS_TO_ANALYZE if DAYS_TO_ANALYZE > 0 else 0
         deployments_per_week = deployments_per_day * 7
         deployments_per_month = deployments_per_day * 30
         
         # Determine DORA level
-        if deployments_per_day >= 1:
-            level = 'elite'
-        elif deployments_per_week >= 1:
-            level = 'high'
-        elif deployments_per_month >= 1:
-            level = 'medium'
-        else:
-            level = 'low'
+        level = classify_level(
+            deployments_per_day, DEPLOYMENT_FREQUENCY_THRESHOLDS, DEPLOYMENT_FREQUENCY_LABELS
+        )
         
         return {
             'total_deployments': total_deployments,
@@ -166,41 +308,17 @@ class ArgocdDoraMetrics:
             'daily_breakdown': dict(daily_deployments)
         }
     
-    def calculate_lead_time(self, apps_data: List[Dict]) -> Dict:
+    def calculate_lead_time(self, app_results: List[Dict]) -> Dict:
         """
         Calculate Lead Time for Changes (DORA Metric 2)
         Time from code commit to deployment in production
         
         Note: This requires Git commit timestamps in ArgoCD history
         """
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=DAYS_TO_ANALYZE)
-        
         lead_times = []
         
-        for app in apps_data:
-            app_name = app.get('metadata', {}).get('name', 'unknown')
-            history = self.get_application_history(app_name)
-            
-            for deployment in history:
-                deployed_at_str = deployment.get('deployedAt')
-                if not deployed_at_str:
-                    continue
-                
-                deployed_at = datetime.strptime(deployed_at_str, '%Y-%m-%dT%H:%M:%SZ')
-                
-                if start_date <= deployed_at <= end_date:
-                    # Get commit timestamp from revision
-                    revision = deployment.get('revision', '')
-                    source = deployment.get('source', {})
-                    
-                    # Try to get commit time from deployment metadata
-                    # This is an approximation - ideally you'd query Git directly
-                    deployed_at_str = deployment.get('deployedAt')
-                    
-                    # For now, use a proxy: time between syncs
-                    # In production, you'd integrate with Git API
-                    lead_times.append(0)  # Placeholder
+        for result in app_results:
+            lead_times.extend(result['lead_times'])
         
         if not lead_times:
             return {
@@ -214,14 +332,7 @@ class ArgocdDoraMetrics:
         avg_lead_time = sum(lead_times) / len(lead_times) if lead_times else 0
         
         # Determine DORA level (in hours)
-        if avg_lead_time < 1:
-            level = 'elite'
-        elif avg_lead_time < 24:
-            level = 'high'
-        elif avg_lead_time < 168:  # 1 week
-            level = 'medium'
-        else:
-            level = 'low'
+        level = classify_level(avg_lead_time, LEAD_TIME_THRESHOLDS)
         
         return {
             'avg_lead_time_hours': round(avg_lead_time, 2),
@@ -230,74 +341,31 @@ class ArgocdDoraMetrics:
             'note': 'Lead time requires Git commit data integration'
         }
     
-    def calculate_change_failure_rate(self, apps_data: List[Dict]) -> Dict:
+    def calculate_change_failure_rate(self, app_results: List[Dict]) -> Dict:
         """
         Calculate Change Failure Rate (DORA Metric 3)
         Percentage of deployments that result in degraded service or require remediation
         """
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=DAYS_TO_ANALYZE)
-        
         total_deployments = 0
         failed_deployments = 0
         degraded_deployments = 0
         app_failure_rates = {}
         
-        for app in apps_data:
-            app_name = app.get('metadata', {}).get('name', 'unknown')
-            history = self.get_application_history(app_name)
+        for result in app_results:
+            app_total = len(result['deployments'])
+            app_failed = result['failures']
             
-            app_total = 0
-            app_failed = 0
-            
-            for i, deployment in enumerate(history):
-                deployed_at_str = deployment.get('deployedAt')
-                if not deployed_at_str:
-                    continue
-                
-                deployed_at = datetime.strptime(deployed_at_str, '%Y-%m-%dT%H:%M:%SZ')
-                
-                if start_date <= deployed_at <= end_date:
-                    total_deployments += 1
-                    app_total += 1
-                    
-                    # Check if this deployment failed or was quickly rolled back
-                    # A rollback is indicated by the next deployment having an older revision
-                    if i < len(history) - 1:
-                        next_deployment = history[i + 1]
-                        next_deployed_at_str = next_deployment.get('deployedAt')
-                        
-                        if next_deployed_at_str:
-                            next_deployed_at = datetime.strptime(
-                                next_deployed_at_str, '%Y-%m-%dT%H:%M:%SZ'
-                            )
-                            
-                            # If next deployment was within 1 hour, consider it a failure
-                            time_diff = (next_deployed_at - deployed_at).total_seconds() / 3600
-                            if time_diff < 1:
-                                failed_deployments += 1
-                                app_failed += 1
-                    
-                    # Check operation state
-                    # Note: This only shows current state, not historical
-                    operation_state = self.get_operation_state(app_name)
-                    if operation_state.get('phase') in ['Failed', 'Error']:
-                        degraded_deployments += 1
+            total_deployments += app_total
+            failed_deployments += app_failed
+            degraded_deployments += result['degraded']
             
             if app_total > 0:
-                app_failure_rates[app_name] = round((app_failed / app_total) * 100, 2)
+                app_failure_rates[result['app_name']] = round((app_failed / app_total) * 100, 2)
         
         failure_rate = (failed_deployments / total_deployments * 100) if total_deployments > 0 else 0
         
         # Determine DORA level
-        if failure_rate < 15:
-            level = 'elite'
-        elif failure_rate < 30:
-            level = 'high'
-        elif failure_rate < 45:
-            level = 'medium'
-        else:
-            level = 'low'
+        level = classify_level(failure_rate, CHANGE_FAILURE_RATE_THRESHOLDS)
         
         return {
             'total_deployments': total_deployments,
@@ -309,46 +377,20 @@ class ArgocdDoraMetrics:
             'note': 'Failure detection based on quick rollbacks (<1 hour)'
         }
     
-    def calculate_mttr(self, apps_data: List[Dict]) -> Dict:
+    def calculate_mttr(self, app_results: List[Dict]) -> Dict:
         """
         Calculate Mean Time to Recovery (DORA Metric 4)
         Average time to restore service after a failure
         """
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=DAYS_TO_ANALYZE)
-        
         recovery_times = []
         app_mttr = {}
         
-        for app in apps_data:
-            app_name = app.get('metadata', {}).get('name', 'unknown')
-            history = self.get_application_history(app_name)
-            
-            app_recovery_times = []
-            
-            for i in range(len(history) - 1):
-                current = history[i]
-                next_deploy = history[i + 1]
-                
-                current_time_str = current.get('deployedAt')
-                next_time_str = next_deploy.get('deployedAt')
-                
-                if not current_time_str or not next_time_str:
-                    continue
-                
-                current_time = datetime.strptime(current_time_str, '%Y-%m-%dT%H:%M:%SZ')
-                next_time = datetime.strptime(next_time_str, '%Y-%m-%dT%H:%M:%SZ')
-                
-                if start_date <= current_time <= end_date:
-                    # If deployments are close together (<1 hour), likely a fix
-                    time_diff_hours = (next_time - current_time).total_seconds() / 3600
-                    
-                    if 0 < time_diff_hours < 1:
-                        recovery_times.append(time_diff_hours)
-                        app_recovery_times.append(time_diff_hours)
+        for result in app_results:
+            app_recovery_times = result['recovery_times']
+            recovery_times.extend(app_recovery_times)
             
             if app_recovery_times:
-                app_mttr[app_name] = round(sum(app_recovery_times) / len(app_recovery_times), 2)
+                app_mttr[result['app_name']] = round(sum(app_recovery_times) / len(app_recovery_times), 2)
         
         if not recovery_times:
             return {
@@ -364,17 +406,10 @@ class ArgocdDoraMetrics:
         avg_mttr_minutes = avg_mttr_hours * 60
         
         # Determine DORA level
-        if avg_mttr_hours < 1:
-            level = 'elite'
-        elif avg_mttr_hours < 24:
-            level = 'high'
-        elif avg_mttr_hours < 168:  # 1 week
-            level = 'medium'
-        else:
-            level = 'low'
-        
-        recovery_times_sorted = sorted(recovery_times)
-        median_mttr = recovery_times_sorted[len(recovery_times_sorted) // 2] if recovery_times_sorted else 0
+        level = classify_level(avg_mttr_hours, MTTR_THRESHOLDS)
+        
+        # median_high picks the same element as sorted(...)[n // 2]
+        median_mttr = statistics.median_high(recovery_times)
         
         return {
             'avg_mttr_hours': round(avg_mttr_hours, 2),
@@ -390,29 +425,46 @@ class ArgocdDoraMetrics:
         """Generate complete DORA metrics report"""
         print(f"\n{'='*60}")
         print(f"Generating DORA Metrics for: {self.cluster_name}")
-        print(f"Time Period: Last {DAYS_TO_ANALYZE} days")
+        print(f"[{self.cluster_name}] Time Period: Last {DAYS_TO_ANALYZE} days")
         print(f"{'='*60}\n")
         
         apps = self.get_applications()
-        print(f"Found {len(apps)} applications")
+        # Clusters run concurrently, so progress lines are tagged with the cluster
+        print(f"[{self.cluster_name}] Found {len(apps)} applications")
         
-        print("\n📊 Calculating Deployment Frequency...")
-        deployment_freq = self.calculate_deployment_frequency(apps)
+        print(f"[{self.cluster_name}] 📥 Fetching application history ({MAX_WORKERS} parallel workers)...")
+        self.prefetch_applications(apps)
         
-        print("⏱️  Calculating Lead Time for Changes...")
-        lead_time = self.calculate_lead_time(apps)
+        # Read the clock once so every metric and generated_at share one window
+        now = datetime.now()
+        end_ts = int(now.timestamp())
+        start_ts = end_ts - DAYS_TO_ANALYZE * 86400
         
-        print("❌ Calculating Change Failure Rate...")
-        failure_rate = self.calculate_change_failure_rate(apps)
+        # Scan each application's history once and share it across all metrics
+        app_results = [
+            self.scan_application_history(
+                app.get('metadata', {}).get('name', 'unknown'), start_ts, end_ts
+            )
+            for app in apps
+        ]
+        
+        print(f"\n[{self.cluster_name}] 📊 Calculating Deployment Frequency...")
+        deployment_freq = self.calculate_deployment_frequency(app_results)
+        
+        print(f"[{self.cluster_name}] ⏱️  Calculating Lead Time for Changes...")
+        lead_time = self.calculate_lead_time(app_results)
         
-        print("🔧 Calculating Mean Time to Recovery...")
-        mttr = self.calculate_mttr(apps)
+        print(f"[{self.cluster_name}] ❌ Calculating Change Failure Rate...")
+        failure_rate = self.calculate_change_failure_rate(app_results)
+        
+        print(f"[{self.cluster_name}] 🔧 Calculating Mean Time to Recovery...")
+        mttr = self.calculate_mttr(app_results)
         
         return {
             'cluster': self.cluster_name,
             'time_period_days': DAYS_TO_ANALYZE,
             'total_applications': len(apps),
-            'generated_at': datetime.now().isoformat(),
+            'generated_at': now.isoformat(),
             'metrics': {
                 'deployment_frequency': deployment_freq,
                 'lead_time_for_changes': lead_time,
@@ -441,14 +493,14 @@ def print_dora_summary(report: Dict):
     print(f"   Per Day: {df['deployments_per_day']}")
     print(f"   Per Week: {df['deployments_per_week']}")
     print(f"   Per Month: {df['deployments_per_month']}")
-    print(f"   DORA Level: {df['dora_level'].upper()} - {df['dora_description']}")
+    print(f"   DORA Level: {LEVEL_UPPER[df['dora_level']]} - {df['dora_description']}")
     print()
     
     # Lead Time
     lt = metrics['lead_time_for_changes']
     print("2. LEAD TIME FOR CHANGES")
-    print(f"   Average: {lt.get('avg_lead_time_hours', 0)} hours")
-    print(f"   DORA Level: {lt['dora_level'].upper()}")
+    print(f"   Average: {lt['avg_lead_time_hours']} hours")
+    print(f"   DORA Level: {LEVEL_UPPER[lt['dora_level']]}")
     if 'note' in lt:
         print(f"   Note: {lt['note']}")
     print()
@@ -459,7 +511,7 @@ def print_dora_summary(report: Dict):
     print(f"   Total Deployments: {cfr['total_deployments']}")
     print(f"   Failed Deployments: {cfr['failed_deployments']}")
     print(f"   Failure Rate: {cfr['change_failure_rate']}%")
-    print(f"   DORA Level: {cfr['dora_level'].upper()} - {cfr['dora_description']}")
+    print(f"   DORA Level: {LEVEL_UPPER[cfr['dora_level']]} - {cfr['dora_description']}")
     if 'note' in cfr:
         print(f"   Note: {cfr['note']}")
     print()
@@ -467,36 +519,26 @@ def print_dora_summary(report: Dict):
     # MTTR
     mttr = metrics['mean_time_to_recovery']
     print("4. MEAN TIME TO RECOVERY (MTTR)")
-    print(f"   Average: {mttr.get('avg_mttr_hours', 0)} hours ({mttr.get('avg_mttr_minutes', 0)} minutes)")
-    print(f"   Median: {mttr.get('median_mttr_hours', 0)} hours")
-    print(f"   Incidents Recovered: {mttr.get('incidents_recovered', 0)}")
-    print(f"   DORA Level: {mttr['dora_level'].upper()}")
+    print(f"   Average: {mttr['avg_mttr_hours']} hours ({mttr['avg_mttr_minutes']} minutes)")
+    print(f"   Median: {mttr['median_mttr_hours']} hours")
+    print(f"   Incidents Recovered: {mttr['incidents_recovered']}")
+    print(f"   DORA Level: {LEVEL_UPPER[mttr['dora_level']]}")
     if 'note' in mttr:
         print(f"   Note: {mttr['note']}")
     print()
     
     # Overall DORA Assessment
-    levels = [
-        df['dora_level'],
-        lt['dora_level'],
-        cfr['dora_level'],
-        mttr['dora_level']
-    ]
-    
-    level_scores = {'elite': 4, 'high': 3, 'medium': 2, 'low': 1, 'unknown': 0}
-    valid_levels = [l for l in levels if l != 'unknown']
+    # Average the known levels in one pass; 'unknown' levels are skipped
+    total_score = 0
+    known = 0
+    for level in (df['dora_level'], lt['dora_level'], cfr['dora_level'], mttr['dora_level']):
+        if level != 'unknown':
+            total_score += LEVEL_SCORES[level]
+            known += 1
     
-    if valid_levels:
-        avg_score = sum(level_scores[l] for l in valid_levels) / len(valid_levels)
-        
-        if avg_score >= 3.5:
-            overall = 'ELITE'
-        elif avg_score >= 2.5:
-            overall = 'HIGH'
-        elif avg_score >= 1.5:
-            overall = 'MEDIUM'
-        else:
-            overall = 'LOW'
+    if known:
+        avg_score = total_score / known
+        overall = classify_level(avg_score, OVERALL_THRESHOLDS, OVERALL_LABELS)
         
         print(f"{'='*80}")
         print(f"OVERALL DORA PERFORMANCE: {overall}")
@@ -505,8 +547,12 @@ def print_dora_summary(report: Dict):
 
 def save_report_json(report: Dict, filename: str):
     """Save report as JSON"""
-    with open(filename, 'w') as f:
-        json.dump(report, f, indent=2)
+    if orjson:
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+    else:
+        with open(filename, 'w', buffering=OUTPUT_BUFFER_SIZE) as f:
+            json.dump(report, f, indent=2)
     print(f"✅ JSON report saved: {filename}")
 
 
@@ -514,72 +560,56 @@ def save_report_csv(report: Dict, filename: str):
     """Save report as CSV"""
     metrics = report['metrics']
     
-    with open(filename, 'w', newline='') as f:
-        writer = csv.writer(f)
-        
-        # Write header
-        writer.writerow(['Metric', 'Value', 'DORA Level', 'Description'])
-        
-        # Deployment Frequency
-        df = metrics['deployment_frequency']
-        writer.writerow([
-            'Deployment Frequency (per day)',
-            df['deployments_per_day'],
-            df['dora_level'],
-            df['dora_description']
-        ])
-        
-        # Lead Time
-        lt = metrics['lead_time_for_changes']
-        writer.writerow([
-            'Lead Time (hours)',
-            lt.get('avg_lead_time_hours', 0),
-            lt['dora_level'],
-            lt.get('dora_description', '')
-        ])
-        
-        # Change Failure Rate
-        cfr = metrics['change_failure_rate']
-        writer.writerow([
-            'Change Failure Rate (%)',
-            cfr['change_failure_rate'],
-            cfr['dora_level'],
-            cfr['dora_description']
-        ])
-        
-        # MTTR
-        mttr = metrics['mean_time_to_recovery']
-        writer.writerow([
-            'MTTR (hours)',
-            mttr.get('avg_mttr_hours', 0),
-            mttr['dora_level'],
-            mttr.get('dora_description', '')
+    rows = [CSV_HEADER]
+    for label, metric_key, value_field in CSV_SUMMARY_ROWS:
+        metric = metrics[metric_key]
+        rows.append([
+            label,
+            metric.get(value_field, 0),
+            metric['dora_level'],
+            metric.get('dora_description', '')
         ])
     
+    with open(filename, 'w', newline='', buffering=OUTPUT_BUFFER_SIZE) as f:
+        csv.writer(f).writerows(rows)
+    
     print(f"✅ CSV report saved: {filename}")
 
 
+def generate_cluster_report(cluster_name: str, config: Dict) -> Dict:
+    """Generate the DORA report for a single cluster"""
+    with ArgocdDoraMetrics(
+        cluster_name,
+        config['url'],
+        config['token']
+    ) as dora:
+        return dora.generate_dora_report()
+
+
 def main():
     """Main execution function"""
     all_reports = []
     
-    # Generate reports for each cluster
-    for cluster_name, config in ARGOCD_CLUSTERS.items():
+    # Generate reports for all clusters in parallel
+    with ThreadPoolExecutor(max_workers=max(1, len(ARGOCD_CLUSTERS))) as executor:
+        futures = {
+            cluster_name: executor.submit(generate_cluster_report, cluster_name, config)
+            for cluster_name, config in ARGOCD_CLUSTERS.items()
+        }
+    
+    # One timestamp for every file written by this run
+    now = datetime.now()
+    timestamp = now.strftime('%Y%m%d_%H%M%S')
+    
+    for cluster_name, future in futures.items():
         try:
-            dora = ArgocdDoraMetrics(
-                cluster_name,
-                config['url'],
-                config['token']
-            )
-            
-            report = dora.generate_dora_report()
+            report = future.result()
             all_reports.append(report)
             
             # Print summary
             print_dora_summary(report)
             
             # Save individual reports
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             json_file = f"dora_report_{cluster_name}_{timestamp}.json"
             csv_file = f"dora_report_{cluster_name}_{timestamp}.csv"
             
@@ -592,11 +622,10 @@ def main():
     
     # Generate combined report
     if len(all_reports) > 1:
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         combined_file = f"dora_report_combined_{timestamp}.json"
         
         combined = {
-            'generated_at': datetime.now().isoformat(),
+            'generated_at': now.isoformat(),
             'clusters': all_reports
         }
         
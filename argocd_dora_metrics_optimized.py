@@ -4,6 +4,7 @@ ArgoCD DORA Metrics Generator - OPTIMIZED VERSION
 
 Optimizations:
 - Parallel API calls using ThreadPoolExecutor
+- Application history read from the list call (no per-app requests)
 - Progress indicators
 - Optional application filtering
 - Configurable worker threads
@@ -12,16 +13,35 @@ Optimizations:
 For large ArgoCD installations (1000+ applications)
 """
 
+import bisect
 import requests
+from requests.adapters import HTTPAdapter
+import urllib3
+from urllib3.util.retry import Retry
 import json
-from datetime import datetime, timedelta
-from collections import defaultdict
+from datetime import datetime
+from collections import Counter, defaultdict, deque
 import csv
+import fnmatch
+import re
+import shelve
+import statistics
 import sys
-from typing import Dict, List, Any
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Any
+from urllib.parse import urlencode
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 
+# Certificate verification is disabled for self-signed ArgoCD servers, so
+# silence the per-request InsecureRequestWarning once for the whole run
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+try:
+    import orjson  # Optional: much faster JSON decoding/encoding
+except ImportError:
+    orjson = None
+
 # Configuration
 ARGOCD_CLUSTERS = {
     'production': {
@@ -40,14 +60,73 @@ DAYS_TO_ANALYZE = 7
 # Performance settings
 MAX_WORKERS = 20  # Number of parallel threads (adjust based on ArgoCD server capacity)
 PROGRESS_INTERVAL = 50  # Show progress every N apps
+BATCH_SIZE = 100  # Apps processed per batch
+BATCH_DELAY_SECONDS = 2  # Pause after a batch that called the API, to avoid overloading ArgoCD
+OUTPUT_BUFFER_SIZE = 1 << 20  # 1 MiB write buffer for report files
+
+# Optional on-disk cache of ArgoCD responses, revalidated with ETag /
+# Last-Modified. Off by default: it stores full Application documents as
+# pickles and is never pruned. Set a path prefix (e.g. '.argocd_http_cache')
+# to enable it; one file per cluster is created with this prefix.
+HTTP_CACHE_FILE = None
+
+# Optional on-disk cache of fetched application histories, keyed by app name
+# and reused while the app's resourceVersion is unchanged. Off by default:
+# entries are pickled and never pruned, even for deleted apps. Set a path
+# prefix (e.g. '.argocd_history_cache') to enable it; one file per cluster.
+HISTORY_CACHE_FILE = None
 
 # Optional: Filter applications (leave empty to analyze all)
 FILTER_CONFIG = {
-    'namespaces': [],  # e.g., ['production', 'prod-*']
+    'namespaces': [],  # e.g., ['production', 'prod-eu']
     'projects': [],    # e.g., ['platform', 'services']
-    'exclude_namespaces': ['kube-system', 'kube-public'],  # Skip these
+    'exclude_namespaces': ['kube-system', 'kube-public'],  # Skip these; globs like 'kube-*' work
 }
 
+
+def _compile_patterns(patterns: List[str]) -> Optional[tuple]:
+    """
+    Split filter patterns into a set of exact names and one compiled matcher
+    for the globs; None when there are no patterns
+    """
+    if not patterns:
+        return None
+    exact = frozenset(p for p in patterns if not any(c in p for c in '*?['))
+    globs = [fnmatch.translate(p) for p in patterns if p not in exact]
+    return exact, (re.compile('|'.join(globs)).match if globs else None)
+
+
+def _matches(value: str, patterns: tuple) -> bool:
+    """Check a value against compiled filter patterns"""
+    exact, glob_match = patterns
+    return value in exact or (glob_match is not None and glob_match(value) is not None)
+
+
+# Namespaces and projects match exactly or as shell-style globs; the
+# patterns are compiled once at import
+_INCLUDE_NAMESPACES = _compile_patterns(FILTER_CONFIG['namespaces'])
+_PROJECTS = _compile_patterns(FILTER_CONFIG['projects'])
+_EXCLUDE_NAMESPACES = _compile_patterns(FILTER_CONFIG['exclude_namespaces'])
+_FILTER_ACTIVE = bool(_INCLUDE_NAMESPACES or _PROJECTS or _EXCLUDE_NAMESPACES)
+
+# Shared default for missing sub-objects in API responses; never mutated
+_EMPTY: Dict = {}
+
+# Application list fields needed for the metrics; the list call then carries
+# each app's history, so no per-application request is needed
+APPLICATION_LIST_FIELDS = ','.join([
+    'items.metadata.name',
+    'items.metadata.namespace',
+    'items.metadata.resourceVersion',
+    'items.spec.project',
+    'items.status.history',
+    'items.status.sync',
+    'items.status.health',
+])
+
+# Fields needed from a single application when its history must be fetched
+APPLICATION_FIELDS = 'status.history'
+
 # DORA Performance Levels
 DORA_LEVELS = {
     'deployment_frequency': {
@@ -76,6 +155,104 @@ DORA_LEVELS = {
     }
 }
 
+# Level lookup tables for bisect: a value below THRESHOLDS[i] gets LABELS[i]
+LEVEL_LABELS = ('elite', 'high', 'medium', 'low')
+MTTR_THRESHOLDS = (1, 24, 168)  # hours: 1 hour, 1 day, 1 week
+CHANGE_FAILURE_RATE_THRESHOLDS = (15, 30, 45)  # percent
+
+# Deployment frequency is higher-is-better: deploys per day for once a month/week/day
+DEPLOYMENT_FREQUENCY_THRESHOLDS = (1 / 30, 1 / 7, 1)
+DEPLOYMENT_FREQUENCY_LABELS = ('low', 'medium', 'high', 'elite')
+
+# Scores used to average the four metric levels into an overall level
+LEVEL_SCORES = {'elite': 4, 'high': 3, 'medium': 2, 'low': 1, 'unknown': 0}
+LEVEL_UPPER = {level: level.upper() for level in LEVEL_SCORES}
+
+# Overall level for an average score: 1.5 and up is MEDIUM, 2.5 HIGH, 3.5 ELITE
+OVERALL_THRESHOLDS = (1.5, 2.5, 3.5)
+OVERALL_LABELS = ('LOW', 'MEDIUM', 'HIGH', 'ELITE')
+
+
+# Summary CSV layout: (row label, metric key, value field)
+CSV_HEADER = ['Metric', 'Value', 'DORA Level', 'Description']
+CSV_SUMMARY_ROWS = (
+    ('Deployment Frequency (per day)', 'deployment_frequency', 'deployments_per_day'),
+    ('Lead Time (hours)', 'lead_time_for_changes', 'avg_lead_time_hours'),
+    ('Change Failure Rate (%)', 'change_failure_rate', 'change_failure_rate'),
+    ('MTTR (hours)', 'mean_time_to_recovery', 'avg_mttr_hours'),
+)
+
+
+def classify_level(value: float, thresholds: tuple, labels: tuple = LEVEL_LABELS) -> str:
+    """Map a metric value to its DORA level"""
+    return labels[bisect.bisect_right(thresholds, value)]
+
+
+def load_json(content: bytes) -> Any:
+    """Decode an ArgoCD API response body"""
+    if orjson:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _parse_argocd_ts(value: str) -> int:
+    """Parse an ArgoCD timestamp ('2024-01-15T12:34:56Z') into epoch seconds with fromisoformat"""
+    if len(value) != 20 or value[10] != 'T' or value[19] != 'Z':
+        raise ValueError(f"unexpected timestamp format: {value!r}")
+    return int(datetime.fromisoformat(value[:-1] + '+00:00').timestamp())
+
+
+def _reduce_history(history: List[Dict], start_ts: int, end_ts: int) -> Tuple[List[int], List[float]]:
+    """
+    Reduce an application's history to its in-window deployment times (epoch
+    seconds) and the recovery times (hours) of its quick rollbacks. Pure CPU
+    work with no I/O or shared state.
+    """
+    # ISO-8601 timestamps sort like the times they represent, so entries
+    # older than the window are skipped without being parsed. A skipped
+    # entry can only follow a deployment out of order, giving a negative
+    # gap that never counts as a failure.
+    start_iso = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(start_ts))
+    
+    # Hot loops below: bind functions and bound methods to locals
+    parse = _parse_argocd_ts
+    
+    # Parse every remaining timestamp exactly once; None marks a skipped,
+    # missing or malformed one
+    timestamps = []
+    add_timestamp = timestamps.append
+    for deployment in history:
+        deployed_at_str = deployment.get('deployedAt')
+        if not deployed_at_str or deployed_at_str < start_iso:
+            add_timestamp(None)
+            continue
+        try:
+            add_timestamp(parse(deployed_at_str))
+        except ValueError:
+            add_timestamp(None)
+    
+    deployments = []
+    recovery_times = []
+    add_deployment = deployments.append
+    add_recovery_time = recovery_times.append
+    
+    # Pair each deployment with the next one's timestamp. Only the
+    # deployment times are kept; nothing downstream needs the rest.
+    for deployed_at, next_deployed_at in zip(timestamps, timestamps[1:] + [None]):
+        if deployed_at is None or not start_ts <= deployed_at <= end_ts:
+            continue
+        
+        add_deployment(deployed_at)
+        
+        # Check for quick rollback (failure indicator)
+        if next_deployed_at is not None:
+            time_diff_hours = (next_deployed_at - deployed_at) / 3600
+            
+            if 0 < time_diff_hours < 1:
+                add_recovery_time(time_diff_hours)
+    
+    return deployments, recovery_times
+
 
 class ArgocdDoraMetricsOptimized:
     def __init__(self, cluster_name: str, argocd_url: str, token: str):
@@ -86,17 +263,91 @@ class ArgocdDoraMetricsOptimized:
             'Authorization': f'Bearer {token}',
             'Content-Type': 'application/json'
         }
-        self.lock = threading.Lock()
-        self.api_call_count = 0
+        # deque.append is atomic, so worker threads can record calls without a lock
+        self._api_calls = deque()
+        
+        # One pooled session shared by all worker threads, so TCP/TLS
+        # connections are reused instead of opened per request
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.verify = False
+        adapter = HTTPAdapter(
+            pool_connections=MAX_WORKERS,
+            pool_maxsize=MAX_WORKERS,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Conditional-GET cache: url -> (etag, last_modified, body)
+        self._http_cache = shelve.open(f'{HTTP_CACHE_FILE}_{cluster_name}') if HTTP_CACHE_FILE else None
+        self._http_cache_lock = threading.Lock()
+        
+        # History cache: app name -> (resourceVersion, history)
+        self._history_cache = shelve.open(f'{HISTORY_CACHE_FILE}_{cluster_name}') if HISTORY_CACHE_FILE else None
+        self._history_cache_lock = threading.Lock()
+    
+    @property
+    def api_call_count(self) -> int:
+        """Number of per-application API calls made so far"""
+        return len(self._api_calls)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """Close pooled HTTP connections and the on-disk caches"""
+        self.session.close()
+        if self._http_cache is not None:
+            self._http_cache.close()
+            self._http_cache = None
+        if self._history_cache is not None:
+            self._history_cache.close()
+            self._history_cache = None
+    
+    def _get_json(self, url: str, timeout: int, params: Dict = None) -> Any:
+        """GET a URL and decode it, reusing the cached body when the server answers 304"""
+        if params:
+            url = f'{url}?{urlencode(params)}'
+        
+        if self._http_cache is None:
+            response = self.session.get(url, timeout=timeout)
+            response.raise_for_status()
+            return load_json(response.content)
+        
+        with self._http_cache_lock:
+            cached = self._http_cache.get(url)
+        
+        headers = {}
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        
+        response = self.session.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and cached:
+            return load_json(cached[2])
+        response.raise_for_status()
+        
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            with self._http_cache_lock:
+                self._http_cache[url] = (etag, last_modified, response.content)
+        return load_json(response.content)
         
     def get_applications(self) -> List[Dict]:
-        """Fetch all applications from ArgoCD with optional filtering"""
+        """Fetch all applications (including their history) from ArgoCD with optional filtering"""
         try:
             url = f'{self.argocd_url}/api/v1/applications'
-            response = requests.get(url, headers=self.headers, verify=False, timeout=30)
-            response.raise_for_status()
-            
-            all_apps = response.json().get('items', [])
+            all_apps = self._get_json(
+                url, timeout=30, params={'fields': APPLICATION_LIST_FIELDS}
+            ).get('items', [])
             print(f"✓ Fetched {len(all_apps)} total applications from API")
             
             # Apply filters if configured
@@ -113,47 +364,56 @@ class ArgocdDoraMetricsOptimized:
     
     def _filter_applications(self, apps: List[Dict]) -> List[Dict]:
         """Filter applications based on FILTER_CONFIG"""
-        if not any([FILTER_CONFIG['namespaces'], FILTER_CONFIG['projects'], 
-                    FILTER_CONFIG['exclude_namespaces']]):
+        if not _FILTER_ACTIVE:
             return apps
         
         filtered = []
         for app in apps:
-            metadata = app.get('metadata', {})
+            metadata = app.get('metadata') or _EMPTY
             namespace = metadata.get('namespace', '')
             
             # Check exclude list
-            if any(ns in namespace for ns in FILTER_CONFIG['exclude_namespaces']):
+            if _EXCLUDE_NAMESPACES and _matches(namespace, _EXCLUDE_NAMESPACES):
                 continue
             
             # Check namespace filter (if specified)
-            if FILTER_CONFIG['namespaces']:
-                if not any(ns in namespace for ns in FILTER_CONFIG['namespaces']):
-                    continue
+            if _INCLUDE_NAMESPACES and not _matches(namespace, _INCLUDE_NAMESPACES):
+                continue
             
             # Check project filter (if specified)
-            spec = app.get('spec', {})
+            spec = app.get('spec') or _EMPTY
             project = spec.get('project', '')
-            if FILTER_CONFIG['projects']:
-                if project not in FILTER_CONFIG['projects']:
-                    continue
+            if _PROJECTS and not _matches(project, _PROJECTS):
+                continue
             
             filtered.append(app)
         
         return filtered
     
-    def get_application_history(self, app_name: str) -> List[Dict]:
-        """Fetch deployment history for an application"""
+    def _get_app_data(self, app_name: str) -> Dict:
+        """Fetch a single application document - the one request per app"""
+        self._api_calls.append(app_name)
+        url = f'{self.argocd_url}/api/v1/applications/{app_name}'
+        return self._get_json(url, timeout=10, params={'fields': APPLICATION_FIELDS})
+    
+    def get_application_history(self, app_name: str, resource_version: str = None) -> List[Dict]:
+        """
+        Fetch deployment history for an application, reusing the cached copy
+        while the app's resourceVersion is unchanged
+        """
+        use_cache = bool(resource_version) and self._history_cache is not None
+        if use_cache:
+            with self._history_cache_lock:
+                cached = self._history_cache.get(app_name)
+            if cached and cached[0] == resource_version:
+                return cached[1]
+        
         try:
-            with self.lock:
-                self.api_call_count += 1
-            
-            url = f'{self.argocd_url}/api/v1/applications/{app_name}'
-            response = requests.get(url, headers=self.headers, verify=False, timeout=10)
-            response.raise_for_status()
-            
-            app_data = response.json()
-            history = app_data.get('status', {}).get('history', [])
+            app_data = self._get_app_data(app_name)
+            history = (app_data.get('status') or _EMPTY).get('history') or []
+            if use_cache:
+                with self._history_cache_lock:
+                    self._history_cache[app_name] = (resource_version, history)
             return history
             
         except requests.exceptions.Timeout:
@@ -163,128 +423,148 @@ class ArgocdDoraMetricsOptimized:
             print(f"⚠️  Error fetching history for {app_name}: {e}")
             return []
     
-    def get_operation_state(self, app_name: str) -> Dict:
-        """Get current operation state of application"""
-        try:
-            url = f'{self.argocd_url}/api/v1/applications/{app_name}'
-            response = requests.get(url, headers=self.headers, verify=False, timeout=10)
-            response.raise_for_status()
-            
-            app_data = response.json()
-            return app_data.get('status', {}).get('operationState', {})
-        except Exception:
-            return {}
-    
-    def process_single_app_history(self, app: Dict, start_date: datetime, end_date: datetime) -> Dict:
+    def process_single_app_history(self, app: Dict, start_ts: int, end_ts: int) -> Dict:
         """Process a single application's history - designed for parallel execution"""
-        app_name = app.get('metadata', {}).get('name', 'unknown')
-        history = self.get_application_history(app_name)
+        metadata = app.get('metadata') or _EMPTY
+        app_name = metadata.get('name', 'unknown')
+        
+        # History normally comes with the application list; fetch it only
+        # when the list response carried no status for this app
+        status = app.get('status')
+        if status is not None:
+            history = status.get('history') or ()
+        else:
+            history = self.get_application_history(app_name, metadata.get('resourceVersion'))
         
-        result = {
+        deployments, recovery_times = _reduce_history(history, start_ts, end_ts)
+        
+        # Every quick rollback is both a failure and a recovery
+        return {
             'app_name': app_name,
-            'deployments': [],
-            'failures': 0,
-            'recovery_times': []
+            'deployments': deployments,
+            'failures': len(recovery_times),
+            'recovery_times': recovery_times
         }
-        
-        for i, deployment in enumerate(history):
-            deployed_at_str = deployment.get('deployedAt')
-            if not deployed_at_str:
-                continue
+    
+    def _process_app_safely(self, app: Dict, start_ts: int, end_ts: int) -> Optional[Dict]:
+        """Process one app, reporting a failure instead of raising it"""
+        try:
+            return self.process_single_app_history(app, start_ts, end_ts)
+        except Exception as e:
+            print(f"   ⚠️  Error processing app: {e}")
+            return None
+    
+    def _iter_processed_apps(self, apps_data: List[Dict], start_ts: int, end_ts: int):
+        """
+        Yield each app's result (None on failure). History that came with the
+        list is processed inline; only apps whose history must be fetched go
+        through the thread pool, batch by batch.
+        """
+        fallback_apps = []
+        for app in apps_data:
+            if app.get('status') is None:
+                fallback_apps.append(app)
+            else:
+                yield self._process_app_safely(app, start_ts, end_ts)
+        
+        for batch_start in range(0, len(fallback_apps), BATCH_SIZE):
+            batch = fallback_apps[batch_start:batch_start + BATCH_SIZE]
             
-            try:
-                deployed_at = datetime.strptime(deployed_at_str, '%Y-%m-%dT%H:%M:%SZ')
-            except ValueError:
-                continue
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                futures = [
+                    executor.submit(self._process_app_safely, app, start_ts, end_ts)
+                    for app in batch
+                ]
+                for future in as_completed(futures):
+                    yield future.result()
             
-            if start_date <= deployed_at <= end_date:
-                result['deployments'].append({
-                    'time': deployed_at,
-                    'revision': deployment.get('revision', '')
-                })
-                
-                # Check for quick rollback (failure indicator)
-                if i < len(history) - 1:
-                    next_deployment = history[i + 1]
-                    next_deployed_at_str = next_deployment.get('deployedAt')
-                    
-                    if next_deployed_at_str:
-                        try:
-                            next_deployed_at = datetime.strptime(
-                                next_deployed_at_str, '%Y-%m-%dT%H:%M:%SZ'
-                            )
-                            time_diff_hours = (next_deployed_at - deployed_at).total_seconds() / 3600
-                            
-                            if 0 < time_diff_hours < 1:
-                                result['failures'] += 1
-                                result['recovery_times'].append(time_diff_hours)
-                        except ValueError:
-                            continue
-        
-        return result
-    
-    def calculate_deployment_frequency(self, apps_data: List[Dict]) -> Dict:
+            # Give the API server a break between batches of history fetches
+            if batch_start + BATCH_SIZE < len(fallback_apps):
+                time.sleep(BATCH_DELAY_SECONDS)
+    
+    def process_applications(self, apps_data: List[Dict], start_ts: int, end_ts: int) -> Iterator[Dict]:
         """
-        Calculate Deployment Frequency (DORA Metric 1) - PARALLEL VERSION
+        Process every application's history - the only pass over the apps.
+        Results are yielded as they complete rather than collected.
         """
         print(f"\n📊 Calculating Deployment Frequency for {len(apps_data)} applications...")
-        print(f"   Using {MAX_WORKERS} parallel workers")
+        print(f"   Using {MAX_WORKERS} parallel workers for history fetches")
         
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=DAYS_TO_ANALYZE)
+        processed = 0
+        write = sys.stdout.write
+        flush = sys.stdout.flush
         
-        deployment_counts = defaultdict(int)
-        app_deployment_counts = defaultdict(int)
-        daily_deployments = defaultdict(int)
+        for result in self._iter_processed_apps(apps_data, start_ts, end_ts):
+            processed += 1
+            
+            if processed % PROGRESS_INTERVAL == 0 or processed == len(apps_data):
+                write(f"   Progress: {processed}/{len(apps_data)} apps processed "
+                      f"({(processed/len(apps_data)*100):.1f}%)\n")
+                flush()
+            
+            if result is not None:
+                yield result
         
-        processed = 0
+        print(f"   ✓ Total API calls made: {self.api_call_count}")
+    
+    def _accumulate(self, processed_results: Iterable[Dict]) -> Dict:
+        """Sweep the per-app results once, collecting the totals every metric needs"""
+        total_deployments = 0
+        failed_deployments = 0
+        app_deployment_counts = defaultdict(int)
+        # Deployments per UTC day, keyed by days since the epoch; labels are formatted once per day at the end
+        daily_deployments = Counter()
+        app_failure_rates = {}
+        recovery_times = []
+        app_mttr = {}
         
-        # Parallel processing
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            futures = {
-                executor.submit(self.process_single_app_history, app, start_date, end_date): app
-                for app in apps_data
-            }
+        for result in processed_results:
+            app_name = result['app_name']
+            deployments = result['deployments']
+            app_total = len(deployments)
+            app_failed = result['failures']
+            app_recovery_times = result['recovery_times']
             
-            for future in as_completed(futures):
-                processed += 1
-                
-                if processed % PROGRESS_INTERVAL == 0 or processed == len(apps_data):
-                    print(f"   Progress: {processed}/{len(apps_data)} apps processed "
-                          f"({(processed/len(apps_data)*100):.1f}%)")
-                
-                try:
-                    result = future.result()
-                    
-                    app_name = result['app_name']
-                    deployments = result['deployments']
-                    
-                    for deploy in deployments:
-                        deployment_counts['total'] += 1
-                        app_deployment_counts[app_name] += 1
-                        
-                        day_key = deploy['time'].strftime('%Y-%m-%d')
-                        daily_deployments[day_key] += 1
-                        
-                except Exception as e:
-                    print(f"   ⚠️  Error processing app: {e}")
-        
-        total_deployments = deployment_counts['total']
+            total_deployments += app_total
+            failed_deployments += app_failed
+            
+            if app_total > 0:
+                app_deployment_counts[app_name] += app_total
+                app_failure_rates[app_name] = round((app_failed / app_total) * 100, 2)
+                daily_deployments.update([deploy // 86400 for deploy in deployments])
+            
+            if app_recovery_times:
+                recovery_times.extend(app_recovery_times)
+                app_mttr[app_name] = round(
+                    sum(app_recovery_times) / len(app_recovery_times), 2
+                )
+        
+        return {
+            'total_deployments': total_deployments,
+            'failed_deployments': failed_deployments,
+            'app_deployment_counts': dict(app_deployment_counts),
+            'daily_deployments': {
+                time.strftime('%Y-%m-%d', time.gmtime(day * 86400)): count
+                for day, count in sorted(daily_deployments.items())
+            },
+            'app_failure_rates': app_failure_rates,
+            'recovery_times': recovery_times,
+            'app_mttr': app_mttr
+        }
+    
+    def calculate_deployment_frequency(self, totals: Dict) -> Dict:
+        """
+        Calculate Deployment Frequency (DORA Metric 1) from the accumulated totals
+        """
+        total_deployments = totals['total_deployments']
         deployments_per_day = total_deployments / DAYS_TO_ANALYZE if DAYS_TO_ANALYZE > 0 else 0
         deployments_per_week = deployments_per_day * 7
         deployments_per_month = deployments_per_day * 30
         
         # Determine DORA level
-        if deployments_per_day >= 1:
-            level = 'elite'
-        elif deployments_per_week >= 1:
-            level = 'high'
-        elif deployments_per_month >= 1:
-            level = 'medium'
-        else:
-            level = 'low'
-        
-        print(f"   ✓ Total API calls made: {self.api_call_count}")
+        level = classify_level(
+            deployments_per_day, DEPLOYMENT_FREQUENCY_THRESHOLDS, DEPLOYMENT_FREQUENCY_LABELS
+        )
         
         return {
             'total_deployments': total_deployments,
@@ -293,8 +573,8 @@ class ArgocdDoraMetricsOptimized:
             'deployments_per_month': round(deployments_per_month, 2),
             'dora_level': level,
             'dora_description': DORA_LEVELS['deployment_frequency'][level],
-            'app_breakdown': dict(app_deployment_counts),
-            'daily_breakdown': dict(daily_deployments)
+            'app_breakdown': totals['app_deployment_counts'],
+            'daily_breakdown': totals['daily_deployments']
         }
     
     def calculate_lead_time(self, apps_data: List[Dict]) -> Dict:
@@ -310,61 +590,19 @@ class ArgocdDoraMetricsOptimized:
             'note': 'Lead time calculation requires Git integration'
         }
     
-    def calculate_change_failure_rate(self, apps_data: List[Dict]) -> Dict:
+    def calculate_change_failure_rate(self, totals: Dict) -> Dict:
         """
-        Calculate Change Failure Rate (DORA Metric 3) - PARALLEL VERSION
+        Calculate Change Failure Rate (DORA Metric 3) from the accumulated totals
         """
         print(f"\n❌ Calculating Change Failure Rate...")
         
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=DAYS_TO_ANALYZE)
-        
-        total_deployments = 0
-        failed_deployments = 0
-        app_failure_rates = {}
-        
-        processed = 0
-        
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            futures = {
-                executor.submit(self.process_single_app_history, app, start_date, end_date): app
-                for app in apps_data
-            }
-            
-            for future in as_completed(futures):
-                processed += 1
-                
-                if processed % PROGRESS_INTERVAL == 0 or processed == len(apps_data):
-                    print(f"   Progress: {processed}/{len(apps_data)} apps processed "
-                          f"({(processed/len(apps_data)*100):.1f}%)")
-                
-                try:
-                    result = future.result()
-                    
-                    app_name = result['app_name']
-                    app_total = len(result['deployments'])
-                    app_failed = result['failures']
-                    
-                    total_deployments += app_total
-                    failed_deployments += app_failed
-                    
-                    if app_total > 0:
-                        app_failure_rates[app_name] = round((app_failed / app_total) * 100, 2)
-                        
-                except Exception as e:
-                    print(f"   ⚠️  Error processing app: {e}")
+        total_deployments = totals['total_deployments']
+        failed_deployments = totals['failed_deployments']
         
         failure_rate = (failed_deployments / total_deployments * 100) if total_deployments > 0 else 0
         
         # Determine DORA level
-        if failure_rate < 15:
-            level = 'elite'
-        elif failure_rate < 30:
-            level = 'high'
-        elif failure_rate < 45:
-            level = 'medium'
-        else:
-            level = 'low'
+        level = classify_level(failure_rate, CHANGE_FAILURE_RATE_THRESHOLDS)
         
         return {
             'total_deployments': total_deployments,
@@ -372,52 +610,17 @@ class ArgocdDoraMetricsOptimized:
             'change_failure_rate': round(failure_rate, 2),
             'dora_level': level,
             'dora_description': DORA_LEVELS['change_failure_rate'][level],
-            'app_breakdown': app_failure_rates,
+            'app_breakdown': totals['app_failure_rates'],
             'note': 'Failure detection based on quick rollbacks (<1 hour)'
         }
     
-    def calculate_mttr(self, apps_data: List[Dict]) -> Dict:
+    def calculate_mttr(self, totals: Dict) -> Dict:
         """
-        Calculate Mean Time to Recovery (DORA Metric 4) - PARALLEL VERSION
+        Calculate Mean Time to Recovery (DORA Metric 4) from the accumulated totals
         """
         print(f"\n🔧 Calculating Mean Time to Recovery...")
         
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=DAYS_TO_ANALYZE)
-        
-        recovery_times = []
-        app_mttr = {}
-        
-        processed = 0
-        
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            futures = {
-                executor.submit(self.process_single_app_history, app, start_date, end_date): app
-                for app in apps_data
-            }
-            
-            for future in as_completed(futures):
-                processed += 1
-                
-                if processed % PROGRESS_INTERVAL == 0 or processed == len(apps_data):
-                    print(f"   Progress: {processed}/{len(apps_data)} apps processed "
-                          f"({(processed/len(apps_data)*100):.1f}%)")
-                
-                try:
-                    result = future.result()
-                    
-                    app_name = result['app_name']
-                    app_recovery_times = result['recovery_times']
-                    
-                    recovery_times.extend(app_recovery_times)
-                    
-                    if app_recovery_times:
-                        app_mttr[app_name] = round(
-                            sum(app_recovery_times) / len(app_recovery_times), 2
-                        )
-                        
-                except Exception as e:
-                    print(f"   ⚠️  Error processing app: {e}")
+        recovery_times = totals['recovery_times']
         
         if not recovery_times:
             return {
@@ -433,17 +636,10 @@ class ArgocdDoraMetricsOptimized:
         avg_mttr_minutes = avg_mttr_hours * 60
         
         # Determine DORA level
-        if avg_mttr_hours < 1:
-            level = 'elite'
-        elif avg_mttr_hours < 24:
-            level = 'high'
-        elif avg_mttr_hours < 168:
-            level = 'medium'
-        else:
-            level = 'low'
+        level = classify_level(avg_mttr_hours, MTTR_THRESHOLDS)
         
-        recovery_times_sorted = sorted(recovery_times)
-        median_mttr = recovery_times_sorted[len(recovery_times_sorted) // 2]
+        # median_high picks the same element as sorted(...)[n // 2]
+        median_mttr = statistics.median_high(recovery_times)
         
         return {
             'avg_mttr_hours': round(avg_mttr_hours, 2),
@@ -452,7 +648,7 @@ class ArgocdDoraMetricsOptimized:
             'incidents_recovered': len(recovery_times),
             'dora_level': level,
             'dora_description': DORA_LEVELS['mttr'][level],
-            'app_breakdown': app_mttr
+            'app_breakdown': totals['app_mttr']
         }
     
     def generate_dora_report(self) -> Dict:
@@ -472,11 +668,18 @@ class ArgocdDoraMetricsOptimized:
             print("❌ No applications found. Check your token and URL configuration.")
             return None
         
-        # All metrics use the same parallel processing approach
-        deployment_freq = self.calculate_deployment_frequency(apps)
+        # Compute the analysis window once so every metric sees the same one
+        end_ts = int(time.time())
+        start_ts = end_ts - DAYS_TO_ANALYZE * 86400
+        
+        # Applications are processed once, in parallel, and each result is
+        # folded into the totals as it completes, so none are kept around
+        totals = self._accumulate(self.process_applications(apps, start_ts, end_ts))
+        
+        deployment_freq = self.calculate_deployment_frequency(totals)
         lead_time = self.calculate_lead_time(apps)
-        failure_rate = self.calculate_change_failure_rate(apps)
-        mttr = self.calculate_mttr(apps)
+        failure_rate = self.calculate_change_failure_rate(totals)
+        mttr = self.calculate_mttr(totals)
         
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
@@ -491,7 +694,7 @@ class ArgocdDoraMetricsOptimized:
             'cluster': self.cluster_name,
             'time_period_days': DAYS_TO_ANALYZE,
             'total_applications': len(apps),
-            'generated_at': datetime.now().isoformat(),
+            'generated_at': end_time.isoformat(),
             'generation_time_seconds': round(duration, 2),
             'api_calls_made': self.api_call_count,
             'metrics': {
@@ -527,14 +730,14 @@ def print_dora_summary(report: Dict):
     print(f"   Per Day: {df['deployments_per_day']}")
     print(f"   Per Week: {df['deployments_per_week']}")
     print(f"   Per Month: {df['deployments_per_month']}")
-    print(f"   DORA Level: {df['dora_level'].upper()} - {df['dora_description']}")
+    print(f"   DORA Level: {LEVEL_UPPER[df['dora_level']]} - {df['dora_description']}")
     print()
     
     # Lead Time
     lt = metrics['lead_time_for_changes']
     print("2. ⏱️  LEAD TIME FOR CHANGES")
-    print(f"   Average: {lt.get('avg_lead_time_hours', 0)} hours")
-    print(f"   DORA Level: {lt['dora_level'].upper()}")
+    print(f"   Average: {lt['avg_lead_time_hours']} hours")
+    print(f"   DORA Level: {LEVEL_UPPER[lt['dora_level']]}")
     if 'note' in lt:
         print(f"   Note: {lt['note']}")
     print()
@@ -545,7 +748,7 @@ def print_dora_summary(report: Dict):
     print(f"   Total Deployments: {cfr['total_deployments']}")
     print(f"   Failed Deployments: {cfr['failed_deployments']}")
     print(f"   Failure Rate: {cfr['change_failure_rate']}%")
-    print(f"   DORA Level: {cfr['dora_level'].upper()} - {cfr['dora_description']}")
+    print(f"   DORA Level: {LEVEL_UPPER[cfr['dora_level']]} - {cfr['dora_description']}")
     if 'note' in cfr:
         print(f"   Note: {cfr['note']}")
     print()
@@ -553,36 +756,26 @@ def print_dora_summary(report: Dict):
     # MTTR
     mttr = metrics['mean_time_to_recovery']
     print("4. 🔧 MEAN TIME TO RECOVERY (MTTR)")
-    print(f"   Average: {mttr.get('avg_mttr_hours', 0)} hours ({mttr.get('avg_mttr_minutes', 0)} minutes)")
-    print(f"   Median: {mttr.get('median_mttr_hours', 0)} hours")
-    print(f"   Incidents Recovered: {mttr.get('incidents_recovered', 0)}")
-    print(f"   DORA Level: {mttr['dora_level'].upper()}")
+    print(f"   Average: {mttr['avg_mttr_hours']} hours ({mttr['avg_mttr_minutes']} minutes)")
+    print(f"   Median: {mttr['median_mttr_hours']} hours")
+    print(f"   Incidents Recovered: {mttr['incidents_recovered']}")
+    print(f"   DORA Level: {LEVEL_UPPER[mttr['dora_level']]}")
     if 'note' in mttr:
         print(f"   Note: {mttr['note']}")
     print()
     
     # Overall DORA Assessment
-    levels = [
-        df['dora_level'],
-        lt['dora_level'],
-        cfr['dora_level'],
-        mttr['dora_level']
-    ]
-    
-    level_scores = {'elite': 4, 'high': 3, 'medium': 2, 'low': 1, 'unknown': 0}
-    valid_levels = [l for l in levels if l != 'unknown']
-    
-    if valid_levels:
-        avg_score = sum(level_scores[l] for l in valid_levels) / len(valid_levels)
-        
-        if avg_score >= 3.5:
-            overall = 'ELITE'
-        elif avg_score >= 2.5:
-            overall = 'HIGH'
-        elif avg_score >= 1.5:
-            overall = 'MEDIUM'
-        else:
-            overall = 'LOW'
+    # Average the known levels in one pass; 'unknown' levels are skipped
+    total_score = 0
+    known = 0
+    for level in (df['dora_level'], lt['dora_level'], cfr['dora_level'], mttr['dora_level']):
+        if level != 'unknown':
+            total_score += LEVEL_SCORES[level]
+            known += 1
+    
+    if known:
+        avg_score = total_score / known
+        overall = classify_level(avg_score, OVERALL_THRESHOLDS, OVERALL_LABELS)
         
         print(f"{'='*80}")
         print(f"🏆 OVERALL DORA PERFORMANCE: {overall}")
@@ -594,8 +787,12 @@ def save_report_json(report: Dict, filename: str):
     if not report:
         return
         
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(report, f, indent=2)
+    if orjson:
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+    else:
+        with open(filename, 'w', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE) as f:
+            json.dump(report, f, indent=2)
     print(f"✅ JSON report saved: {filename}")
 
 
@@ -606,43 +803,19 @@ def save_report_csv(report: Dict, filename: str):
         
     metrics = report['metrics']
     
-    with open(filename, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        
-        writer.writerow(['Metric', 'Value', 'DORA Level', 'Description'])
-        
-        df = metrics['deployment_frequency']
-        writer.writerow([
-            'Deployment Frequency (per day)',
-            df['deployments_per_day'],
-            df['dora_level'],
-            df['dora_description']
-        ])
-        
-        lt = metrics['lead_time_for_changes']
-        writer.writerow([
-            'Lead Time (hours)',
-            lt.get('avg_lead_time_hours', 0),
-            lt['dora_level'],
-            lt.get('dora_description', '')
-        ])
-        
-        cfr = metrics['change_failure_rate']
-        writer.writerow([
-            'Change Failure Rate (%)',
-            cfr['change_failure_rate'],
-            cfr['dora_level'],
-            cfr['dora_description']
-        ])
-        
-        mttr = metrics['mean_time_to_recovery']
-        writer.writerow([
-            'MTTR (hours)',
-            mttr.get('avg_mttr_hours', 0),
-            mttr['dora_level'],
-            mttr.get('dora_description', '')
+    rows = [CSV_HEADER]
+    for label, metric_key, value_field in CSV_SUMMARY_ROWS:
+        metric = metrics[metric_key]
+        rows.append([
+            label,
+            metric.get(value_field, 0),
+            metric['dora_level'],
+            metric.get('dora_description', '')
         ])
     
+    with open(filename, 'w', newline='', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE) as f:
+        csv.writer(f).writerows(rows)
+    
     print(f"✅ CSV report saved: {filename}")
 
 
@@ -661,13 +834,12 @@ def main():
     
     for cluster_name, config in ARGOCD_CLUSTERS.items():
         try:
-            dora = ArgocdDoraMetricsOptimized(
+            with ArgocdDoraMetricsOptimized(
                 cluster_name,
                 config['url'],
                 config['token']
-            )
-            
-            report = dora.generate_dora_report()
+            ) as dora:
+                report = dora.generate_dora_report()
             
             if not report:
                 continue
@@ -690,11 +862,12 @@ def main():
             continue
     
     if len(all_reports) > 1:
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        now = datetime.now()
+        timestamp = now.strftime('%Y%m%d_%H%M%S')
         combined_file = f"dora_report_combined_{timestamp}.json"
         
         combined = {
-            'generated_at': datetime.now().isoformat(),
+            'generated_at': now.isoformat(),
             'clusters': all_reports
         }
         
@@ -703,7 +876,4 @@ def main():
 
 
 if __name__ == '__main__':
-    import urllib3
-    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-    
     main()
@@ -5,229 +5,259 @@ ArgoCD DORA Metrics - HTML Dashboard Generator
 Generates an interactive HTML dashboard from DORA metrics JSON reports
 """
 
+import bisect
+import functools
+import hashlib
+import heapq
+import html
 import json
+import operator
+import os
+import re
+import shutil
 import sys
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import orjson  # Optional: much faster JSON decoding/encoding
+except ImportError:
+    orjson = None
 
-HTML_TEMPLATE = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>DORA Metrics Dashboard - {cluster}</title>
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    <style>
-        * {{
+# Optional cache of rendered dashboards, keyed by report content. Off by
+# default, since entries are never pruned. Set a directory (e.g.
+# '~/.cache/dora_dashboards') to enable it.
+DASHBOARD_CACHE_DIR = None
+
+
+# Dashboard stylesheet. Kept out of HTML_TEMPLATE so its braces need no
+# escaping and str.format never has to scan it.
+DASHBOARD_CSS = """
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             min-height: 100vh;
             padding: 20px;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1400px;
             margin: 0 auto;
-        }}
+        }
         
-        .header {{
+        .header {
             background: white;
             border-radius: 12px;
             padding: 30px;
             margin-bottom: 20px;
             box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        }}
+        }
         
-        .header h1 {{
+        .header h1 {
             color: #2d3748;
             font-size: 2.5em;
             margin-bottom: 10px;
-        }}
+        }
         
-        .header .meta {{
+        .header .meta {
             color: #718096;
             font-size: 1.1em;
-        }}
+        }
         
-        .metrics-grid {{
+        .metrics-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
             gap: 20px;
             margin-bottom: 30px;
-        }}
+        }
         
-        .metric-card {{
+        .metric-card {
             background: white;
             border-radius: 12px;
             padding: 25px;
             box-shadow: 0 4px 6px rgba(0,0,0,0.1);
             transition: transform 0.2s;
-        }}
+        }
         
-        .metric-card:hover {{
+        .metric-card:hover {
             transform: translateY(-5px);
             box-shadow: 0 6px 12px rgba(0,0,0,0.15);
-        }}
+        }
         
-        .metric-card h2 {{
+        .metric-card h2 {
             color: #2d3748;
             font-size: 1.2em;
             margin-bottom: 15px;
             display: flex;
             align-items: center;
-        }}
+        }
         
-        .metric-card h2 .icon {{
+        .metric-card h2 .icon {
             font-size: 1.5em;
             margin-right: 10px;
-        }}
+        }
         
-        .metric-value {{
+        .metric-value {
             font-size: 3em;
             font-weight: bold;
             margin: 15px 0;
-        }}
+        }
         
-        .metric-label {{
+        .metric-label {
             color: #718096;
             font-size: 0.9em;
             text-transform: uppercase;
             letter-spacing: 1px;
-        }}
+        }
         
-        .dora-level {{
+        .dora-level {
             display: inline-block;
             padding: 8px 16px;
             border-radius: 20px;
             font-weight: 600;
             font-size: 0.9em;
             margin-top: 10px;
-        }}
+        }
         
-        .dora-elite {{
+        .dora-elite {
             background: #10b981;
             color: white;
-        }}
+        }
         
-        .dora-high {{
+        .dora-high {
             background: #3b82f6;
             color: white;
-        }}
+        }
         
-        .dora-medium {{
+        .dora-medium {
             background: #f59e0b;
             color: white;
-        }}
+        }
         
-        .dora-low {{
+        .dora-low {
             background: #ef4444;
             color: white;
-        }}
+        }
         
-        .dora-unknown {{
+        .dora-unknown {
             background: #6b7280;
             color: white;
-        }}
+        }
         
-        .chart-container {{
+        .chart-container {
             background: white;
             border-radius: 12px;
             padding: 25px;
             box-shadow: 0 4px 6px rgba(0,0,0,0.1);
             margin-bottom: 20px;
-        }}
+        }
         
-        .chart-container h2 {{
+        .chart-container h2 {
             color: #2d3748;
             margin-bottom: 20px;
-        }}
+        }
+        
+        .deployment-chart {
+            width: 100%;
+            height: auto;
+            font-size: 11px;
+            fill: #718096;
+        }
         
-        .overall-assessment {{
+        .overall-assessment {
             background: white;
             border-radius: 12px;
             padding: 40px;
             text-align: center;
             box-shadow: 0 4px 6px rgba(0,0,0,0.1);
             margin-bottom: 20px;
-        }}
+        }
         
-        .overall-assessment h2 {{
+        .overall-assessment h2 {
             color: #2d3748;
             font-size: 1.5em;
             margin-bottom: 15px;
-        }}
+        }
         
-        .overall-assessment .level {{
+        .overall-assessment .level {
             font-size: 3.5em;
             font-weight: bold;
             margin: 20px 0;
-        }}
+        }
         
-        .app-breakdown {{
+        .app-breakdown {
             background: white;
             border-radius: 12px;
             padding: 25px;
             box-shadow: 0 4px 6px rgba(0,0,0,0.1);
             margin-bottom: 20px;
-        }}
+        }
         
-        .app-breakdown h2 {{
+        .app-breakdown h2 {
             color: #2d3748;
             margin-bottom: 20px;
-        }}
+        }
         
-        .app-table {{
+        .app-table {
             width: 100%;
             border-collapse: collapse;
-        }}
+        }
         
-        .app-table th {{
+        .app-table th {
             background: #f7fafc;
             padding: 12px;
             text-align: left;
             font-weight: 600;
             color: #2d3748;
             border-bottom: 2px solid #e2e8f0;
-        }}
+        }
         
-        .app-table td {{
+        .app-table td {
             padding: 12px;
             border-bottom: 1px solid #e2e8f0;
-        }}
+        }
         
-        .app-table tr:hover {{
+        .app-table tr:hover {
             background: #f7fafc;
-        }}
+        }
         
-        .footer {{
+        .footer {
             text-align: center;
             color: white;
             padding: 20px;
             font-size: 0.9em;
-        }}
+        }
         
-        .trend-indicator {{
+        .trend-indicator {
             display: inline-block;
             margin-left: 10px;
             font-size: 0.8em;
-        }}
+        }
         
-        .trend-up {{
+        .trend-up {
             color: #10b981;
-        }}
+        }
         
-        .trend-down {{
+        .trend-down {
             color: #ef4444;
-        }}
-    </style>
+        }
+    """
+
+
+HTML_TEMPLATE = """
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>DORA Metrics Dashboard - {cluster}</title>
+    {stylesheet}
 </head>
 <body>
     <div class="container">
@@ -297,7 +327,7 @@ HTML_TEMPLATE = """
         <!-- Charts -->
         <div class="chart-container">
             <h2>📊 Daily Deployment Trend</h2>
-            <canvas id="deploymentChart"></canvas>
+            {deployment_chart}
         </div>
         
         <!-- App Breakdown -->
@@ -307,194 +337,357 @@ HTML_TEMPLATE = """
             Generated by ArgoCD DORA Metrics Generator | {generated_at}
         </div>
     </div>
-    
-    <script>
-        // Deployment Trend Chart
-        const dailyData = {daily_data};
-        const ctx = document.getElementById('deploymentChart').getContext('2d');
-        new Chart(ctx, {{
-            type: 'bar',
-            data: {{
-                labels: Object.keys(dailyData),
-                datasets: [{{
-                    label: 'Deployments',
-                    data: Object.values(dailyData),
-                    backgroundColor: 'rgba(102, 126, 234, 0.8)',
-                    borderColor: 'rgba(102, 126, 234, 1)',
-                    borderWidth: 1
-                }}]
-            }},
-            options: {{
-                responsive: true,
-                scales: {{
-                    y: {{
-                        beginAtZero: true,
-                        ticks: {{
-                            stepSize: 1
-                        }}
-                    }}
-                }},
-                plugins: {{
-                    legend: {{
-                        display: false
-                    }}
-                }}
-            }}
-        }});
-    </script>
 </body>
 </html>
 """
 
 
-def get_level_color(level: str) -> str:
-    """Get color for DORA level"""
-    colors = {
-        'elite': '#10b981',
-        'high': '#3b82f6',
-        'medium': '#f59e0b',
-        'low': '#ef4444',
-        'unknown': '#6b7280'
-    }
-    return colors.get(level, '#6b7280')
+def _minify_css(css: str) -> str:
+    """Strip the indentation and the whitespace around CSS punctuation"""
+    return re.sub(r'\s*([{};:,])\s*', r'\1', re.sub(r'\s+', ' ', css)).strip()
+
 
+# The stylesheet is minified once at import, not on every render
+_MINIFIED_CSS = _minify_css(DASHBOARD_CSS)
+_INLINE_STYLESHEET = f'<style>{_MINIFIED_CSS}</style>'
 
-def generate_app_breakdown_html(metrics: dict) -> str:
-    """Generate HTML for application breakdown tables"""
-    html = ""
+# HTML_TEMPLATE split around its large fields, which are written out as-is
+# rather than copied into one big formatted string. The text in between is
+# bound to str.format_map once, so the fields dict is passed without
+# being unpacked into keyword arguments on every render.
+_TEMPLATE_PARTS = [
+    part if i % 2 else part.format_map
+    for i, part in enumerate(re.split(r'\{(stylesheet|app_breakdown_html)\}', HTML_TEMPLATE))
+]
+
+
+def write_template(f, fields: dict):
+    """
+    Fill HTML_TEMPLATE and write it to a file piece by piece. The large
+    fields may be a string or a list of fragments.
+    """
+    for i, part in enumerate(_TEMPLATE_PARTS):
+        if i % 2 == 0:
+            f.write(part(fields))
+            continue
+        
+        # Odd entries are the names of the large fields split out above
+        value = fields[part]
+        if isinstance(value, str):
+            f.write(value)
+        else:
+            f.writelines(value)
+
+
+def _stylesheet_tag(output_file: str, css_href: str = None) -> str:
+    """
+    The page's stylesheet: inline by default, or a link to css_href, which is
+    written next to the page unless an identical copy is already there
+    """
+    if not css_href:
+        return _INLINE_STYLESHEET
     
-    # Deployment frequency breakdown
-    df_breakdown = metrics.get('deployment_frequency', {}).get('app_breakdown', {})
-    if df_breakdown:
-        html += """
+    # css_href is both the link and the file written beside the page, so
+    # URLs and paths into other directories can't be honoured
+    if os.path.basename(css_href) != css_href or '\\' in css_href or css_href in ('.', '..'):
+        raise ValueError(f"stylesheet must be a bare file name, got {css_href!r}")
+    
+    css_file = Path(output_file).parent / css_href
+    if not css_file.exists() or css_file.read_text(encoding='utf-8') != _MINIFIED_CSS:
+        css_file.write_text(_MINIFIED_CSS, encoding='utf-8')
+    return f'<link rel="stylesheet" href="{html.escape(css_href)}">'
+
+
+@functools.lru_cache(maxsize=None)
+def _generator_digest() -> bytes:
+    """Digest of this generator's source, so editing it invalidates cached pages"""
+    return hashlib.blake2b(Path(__file__).read_bytes(), digest_size=16).digest()
+
+
+def _cached_dashboard_path(content: bytes, stylesheet: str):
+    """
+    Path of the cached page for a report, keyed by the report bytes, the
+    stylesheet tag and this generator's own source; None when caching is disabled
+    """
+    if not DASHBOARD_CACHE_DIR:
+        return None
+    digest = hashlib.blake2b(content, digest_size=16)
+    digest.update(stylesheet.encode())
+    digest.update(_generator_digest())
+    return Path(DASHBOARD_CACHE_DIR).expanduser() / f'{digest.hexdigest()}.html'
+
+
+def _store_cached_dashboard(output_file: str, cached_file: Path):
+    """Copy a freshly rendered page into the cache; a cache that can't be written is skipped"""
+    try:
+        cached_file.parent.mkdir(parents=True, exist_ok=True)
+        # Copy under a temporary name first so readers never see a partial page
+        partial_file = cached_file.with_suffix(f'.{os.getpid()}.tmp')
+        shutil.copyfile(output_file, partial_file)
+        os.replace(partial_file, cached_file)
+    except OSError:
+        pass
+
+
+def load_json(content: bytes):
+    """Decode a JSON report"""
+    if orjson:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _escape_strings(value):
+    """Return a copy of a decoded JSON value with every string, keys included, HTML-escaped"""
+    if isinstance(value, str):
+        return html.escape(value)
+    if isinstance(value, dict):
+        return {html.escape(k): _escape_strings(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_escape_strings(v) for v in value]
+    return value
+
+
+def _upper_escaped(text: str) -> str:
+    """Upper-case text that _escape_strings already escaped, leaving its entities intact"""
+    return html.escape(html.unescape(text).upper())
+
+
+# Colors for each DORA level, matching the .dora-* badge styles
+_LEVEL_COLORS = {
+    'elite': '#10b981',
+    'high': '#3b82f6',
+    'medium': '#f59e0b',
+    'low': '#ef4444',
+    'unknown': '#6b7280'
+}
+_UNKNOWN_COLOR = _LEVEL_COLORS['unknown']
+
+
+# Rank of each known DORA level
+_LEVEL_RANKS = {'low': 1, 'medium': 2, 'high': 3, 'elite': 4}
+
+# Overall level for an average rank: 1.5 and up is MEDIUM, 2.5 HIGH, 3.5 ELITE.
+# Same thresholds as print_dora_summary in the metrics generators.
+OVERALL_THRESHOLDS = (1.5, 2.5, 3.5)
+OVERALL_LABELS = ('LOW', 'MEDIUM', 'HIGH', 'ELITE')
+
+# Summary shown under the overall level
+_OVERALL_DESCRIPTIONS = {
+    'ELITE': 'Your team is performing at the highest level! Keep up the excellent work.',
+    'HIGH': 'Strong performance across most metrics. Focus on areas for improvement.',
+    'MEDIUM': 'Good progress, but there\'s room for optimization.',
+    'LOW': 'Consider focusing on improving deployment practices and reliability.'
+}
+
+
+def format_generated_at(value: str) -> str:
+    """Turn an ISO timestamp into 'YYYY-MM-DD HH:MM:SS'"""
+    # isoformat() output already has this layout, so slice it rather than
+    # parsing it into a datetime and formatting it back
+    if len(value) >= 19 and value[10] in 'T ' and value[13] == ':' and value[16] == ':':
+        return value[:10] + ' ' + value[11:19]
+    return datetime.fromisoformat(value).strftime('%Y-%m-%d %H:%M:%S')
+
+
+# Daily deployment chart geometry, in SVG user units: the peak label sits
+# above the bars and the day labels below the baseline
+_CHART_WIDTH = 800
+_CHART_HEIGHT = 200
+_CHART_PEAK_LABEL_HEIGHT = 20
+_CHART_LABEL_HEIGHT = 50
+_CHART_LEFT_PADDING = 30  # Room for the first slanted day label
+_CHART_MAX_DAY_LABELS = 14
+
+
+def daily_bar_svg(daily_data: dict) -> str:
+    """Render daily deployment counts as a static SVG bar chart, one bar per day"""
+    if not daily_data:
+        return '<p class="metric-label">No deployments in this period</p>'
+    
+    days = sorted(daily_data)
+    peak = max(max(daily_data.values()), 1)
+    slot = _CHART_WIDTH / len(days)
+    bar_width = slot * 0.8
+    baseline = _CHART_HEIGHT
+    # Past _CHART_MAX_DAY_LABELS days, only every label_step-th day is labelled
+    label_step = -(-len(days) // _CHART_MAX_DAY_LABELS)
+    
+    parts = [
+        f'<svg class="deployment-chart" viewBox="-{_CHART_LEFT_PADDING} 0 '
+        f'{_CHART_WIDTH + _CHART_LEFT_PADDING} {_CHART_HEIGHT + _CHART_LABEL_HEIGHT}" '
+        f'role="img" aria-label="Daily deployments">',
+        f'<text x="0" y="12">max {peak}</text>',
+        f'<line x1="0" y1="{baseline}" x2="{_CHART_WIDTH}" y2="{baseline}" stroke="#e2e8f0"/>',
+    ]
+    for i, day in enumerate(days):
+        count = daily_data[day]
+        bar_height = (_CHART_HEIGHT - _CHART_PEAK_LABEL_HEIGHT) * count / peak
+        x = i * slot + (slot - bar_width) / 2
+        label_x = x + bar_width / 2
+        parts.append(
+            f'<rect x="{x:.1f}" y="{baseline - bar_height:.1f}" width="{bar_width:.1f}" '
+            f'height="{bar_height:.1f}" fill="rgba(102, 126, 234, 0.8)" '
+            f'stroke="rgba(102, 126, 234, 1)"><title>{day}: {count}</title></rect>'
+        )
+        # Day labels show MM-DD, slanted so they don't run into each other
+        if i % label_step == 0:
+            parts.append(
+                f'<text x="{label_x:.1f}" y="{baseline + 14}" text-anchor="end" '
+                f'transform="rotate(-45 {label_x:.1f} {baseline + 14})">{day[5:]}</text>'
+            )
+    parts.append('</svg>')
+    return ''.join(parts)
+
+
+# Breakdown table layout; rows come from the row templates below
+_TABLE_HEAD = """
         <div class="app-breakdown">
-            <h2>📱 Top Applications by Deployment Count</h2>
+            <h2>{title}</h2>
             <table class="app-table">
                 <thead>
                     <tr>
-                        <th>Application</th>
-                        <th>Deployments</th>
+{header_cells}
                     </tr>
                 </thead>
                 <tbody>
-        """
-        
-        sorted_apps = sorted(df_breakdown.items(), key=lambda x: x[1], reverse=True)[:10]
-        for app, count in sorted_apps:
-            html += f"""
-                    <tr>
-                        <td>{app}</td>
-                        <td><strong>{count}</strong></td>
-                    </tr>
-            """
-        
-        html += """
+        """.format
+
+_TABLE_FOOT = """
                 </tbody>
             </table>
         </div>
         """
-    
-    # Failure rate breakdown
-    cfr_breakdown = metrics.get('change_failure_rate', {}).get('app_breakdown', {})
-    if cfr_breakdown:
-        html += """
-        <div class="app-breakdown">
-            <h2>⚠️ Applications by Failure Rate</h2>
-            <table class="app-table">
-                <thead>
+
+
+def _render_table(parts: list, title: str, headers: tuple, rows) -> None:
+    """Append a breakdown table with the given title, column headers and rendered rows to parts"""
+    header_cells = '\n'.join([f'                        <th>{header}</th>' for header in headers])
+    parts.append(_TABLE_HEAD(title=title, header_cells=header_cells))
+    parts.extend(rows)
+    parts.append(_TABLE_FOOT)
+
+
+def _failure_rate_style(rate: float) -> str:
+    """Inline style for a failure rate cell: green under 15%, red over 30%"""
+    return 'color: #10b981;' if rate < 15 else 'color: #ef4444;' if rate > 30 else ''
+
+
+# Sort key for (app, value) breakdown items
+_BY_VALUE = operator.itemgetter(1)
+
+# Breakdown table rows, bound to str.format once
+_DEPLOYMENT_ROW = """
                     <tr>
-                        <th>Application</th>
-                        <th>Failure Rate</th>
+                        <td>{app}</td>
+                        <td><strong>{count}</strong></td>
                     </tr>
-                </thead>
-                <tbody>
-        """
-        
-        sorted_apps = sorted(cfr_breakdown.items(), key=lambda x: x[1], reverse=True)[:10]
-        for app, rate in sorted_apps:
-            color = 'color: #10b981;' if rate < 15 else 'color: #ef4444;' if rate > 30 else ''
-            html += f"""
+            """.format
+
+_FAILURE_RATE_ROW = """
                     <tr>
                         <td>{app}</td>
                         <td style="{color}"><strong>{rate}%</strong></td>
                     </tr>
-            """
-        
-        html += """
-                </tbody>
-            </table>
-        </div>
-        """
+            """.format
+
+
+def render_app_breakdown(parts: list, metrics: dict) -> None:
+    """Append the application breakdown tables to a list of HTML fragments"""
+    # Deployment frequency breakdown
+    df_breakdown = metrics.get('deployment_frequency', {}).get('app_breakdown', {})
+    if df_breakdown:
+        sorted_apps = heapq.nlargest(10, df_breakdown.items(), key=_BY_VALUE)
+        _render_table(
+            parts, '📱 Top Applications by Deployment Count', ('Application', 'Deployments'),
+            (_DEPLOYMENT_ROW(app=app, count=count) for app, count in sorted_apps)
+        )
     
-    return html
+    # Failure rate breakdown
+    cfr_breakdown = metrics.get('change_failure_rate', {}).get('app_breakdown', {})
+    if cfr_breakdown:
+        sorted_apps = heapq.nlargest(10, cfr_breakdown.items(), key=_BY_VALUE)
+        _render_table(
+            parts, '⚠️ Applications by Failure Rate', ('Application', 'Failure Rate'),
+            (_FAILURE_RATE_ROW(app=app, color=_failure_rate_style(rate), rate=rate)
+             for app, rate in sorted_apps)
+        )
 
 
-def generate_dashboard(json_file: str, output_file: str = None):
-    """Generate HTML dashboard from JSON report"""
+def generate_dashboard(json_file: str, output_file: str = None, css_href: str = None):
+    """
+    Generate HTML dashboard from JSON report. The stylesheet is inlined unless
+    css_href names a shared stylesheet file to link to (e.g. 'dashboard.css').
+    """
+    
+    if not output_file:
+        output_file = json_file.replace('.json', '.html')
+    
+    stylesheet = _stylesheet_tag(output_file, css_href)
     
     # Load JSON report
-    with open(json_file, 'r') as f:
-        report = json.load(f)
+    with open(json_file, 'rb') as f:
+        content = f.read()
+    
+    # An unchanged report renders to the same page, so reuse the cached one
+    cached_file = _cached_dashboard_path(content, stylesheet)
+    if cached_file is not None and cached_file.exists():
+        shutil.copyfile(cached_file, output_file)
+        print(f"✅ Dashboard generated: {output_file} (cached)")
+        return output_file
+    
+    report = load_json(content)
+    
+    # App names, notes etc. go into the page verbatim, so escape them all
+    # once here rather than cell by cell while rendering
+    report = _escape_strings(report)
     
     metrics = report['metrics']
     
     # Extract deployment frequency data
     df = metrics['deployment_frequency']
     df_level = df['dora_level']
-    df_color = get_level_color(df_level)
+    df_color = _LEVEL_COLORS.get(df_level, _UNKNOWN_COLOR)
     
     # Extract lead time data
     lt = metrics['lead_time_for_changes']
     lt_level = lt['dora_level']
-    lt_color = get_level_color(lt_level)
+    lt_color = _LEVEL_COLORS.get(lt_level, _UNKNOWN_COLOR)
     lt_note = f"<div style='margin-top: 10px; color: #718096; font-size: 0.85em;'>{lt.get('note', '')}</div>" if 'note' in lt else ""
     
     # Extract change failure rate data
     cfr = metrics['change_failure_rate']
     cfr_level = cfr['dora_level']
-    cfr_color = get_level_color(cfr_level)
+    cfr_color = _LEVEL_COLORS.get(cfr_level, _UNKNOWN_COLOR)
     
     # Extract MTTR data
     mttr = metrics['mean_time_to_recovery']
     mttr_level = mttr['dora_level']
-    mttr_color = get_level_color(mttr_level)
+    mttr_color = _LEVEL_COLORS.get(mttr_level, _UNKNOWN_COLOR)
     
     # Calculate overall level
     levels = [df_level, lt_level, cfr_level, mttr_level]
-    level_scores = {'elite': 4, 'high': 3, 'medium': 2, 'low': 1, 'unknown': 0}
-    valid_levels = [l for l in levels if l != 'unknown']
+    ranks = [_LEVEL_RANKS[l] for l in levels if l in _LEVEL_RANKS]
     
-    if valid_levels:
-        avg_score = sum(level_scores[l] for l in valid_levels) / len(valid_levels)
-        if avg_score >= 3.5:
-            overall_level = 'ELITE'
-        elif avg_score >= 2.5:
-            overall_level = 'HIGH'
-        elif avg_score >= 1.5:
-            overall_level = 'MEDIUM'
-        else:
-            overall_level = 'LOW'
+    if ranks:
+        avg_rank = sum(ranks) / len(ranks)
+        overall_level = OVERALL_LABELS[bisect.bisect_right(OVERALL_THRESHOLDS, avg_rank)]
     else:
         overall_level = 'UNKNOWN'
     
-    overall_color = get_level_color(overall_level.lower())
-    
-    overall_descriptions = {
-        'ELITE': 'Your team is performing at the highest level! Keep up the excellent work.',
-        'HIGH': 'Strong performance across most metrics. Focus on areas for improvement.',
-        'MEDIUM': 'Good progress, but there\'s room for optimization.',
-        'LOW': 'Consider focusing on improving deployment practices and reliability.'
-    }
+    overall_color = _LEVEL_COLORS.get(overall_level.lower(), _UNKNOWN_COLOR)
     
     # Generate app breakdown HTML
-    app_breakdown_html = generate_app_breakdown_html(metrics)
+    # Its fragments go straight to the file, without being joined first
+    app_breakdown_parts = []
+    render_app_breakdown(app_breakdown_parts, metrics)
     
-    # Fill template
-    html = HTML_TEMPLATE.format(
-        cluster=report['cluster'].upper(),
+    # Template fields
+    fields = dict(
+        stylesheet=stylesheet,
+        cluster=_upper_escaped(report['cluster']),
         period=report['time_period_days'],
         total_apps=report['total_applications'],
-        generated_at=datetime.fromisoformat(report['generated_at']).strftime('%Y-%m-%d %H:%M:%S'),
+        generated_at=format_generated_at(report['generated_at']),
         
         # Deployment Frequency
         df_value=df['deployments_per_day'],
@@ -502,13 +695,13 @@ def generate_dashboard(json_file: str, output_file: str = None):
         df_month=df['deployments_per_month'],
         df_total=df['total_deployments'],
         df_level=df_level,
-        df_level_text=df_level.upper(),
+        df_level_text=_upper_escaped(df_level),
         df_color=df_color,
         
         # Lead Time
         lt_value=lt.get('avg_lead_time_hours', 0),
         lt_level=lt_level,
-        lt_level_text=lt_level.upper(),
+        lt_level_text=_upper_escaped(lt_level),
         lt_color=lt_color,
         lt_note=lt_note,
         
@@ -517,7 +710,7 @@ def generate_dashboard(json_file: str, output_file: str = None):
         cfr_failed=cfr['failed_deployments'],
         cfr_total=cfr['total_deployments'],
         cfr_level=cfr_level,
-        cfr_level_text=cfr_level.upper(),
+        cfr_level_text=_upper_escaped(cfr_level),
         cfr_color=cfr_color,
         
         # MTTR
@@ -525,27 +718,28 @@ def generate_dashboard(json_file: str, output_file: str = None):
         mttr_minutes=mttr.get('avg_mttr_minutes', 0),
         mttr_incidents=mttr.get('incidents_recovered', 0),
         mttr_level=mttr_level,
-        mttr_level_text=mttr_level.upper(),
+        mttr_level_text=_upper_escaped(mttr_level),
         mttr_color=mttr_color,
         
         # Overall
         overall_level=overall_level,
         overall_color=overall_color,
-        overall_description=overall_descriptions.get(overall_level, ''),
+        overall_description=_OVERALL_DESCRIPTIONS.get(overall_level, ''),
         
-        # Charts data
-        daily_data=json.dumps(df.get('daily_breakdown', {})),
+        # Charts
+        deployment_chart=daily_bar_svg(df.get('daily_breakdown', {})),
         
         # App breakdown
-        app_breakdown_html=app_breakdown_html
+        app_breakdown_html=app_breakdown_parts
     )
     
-    # Write output
-    if not output_file:
-        output_file = json_file.replace('.json', '.html')
+    # Write output. A 1 MiB buffer lets a large page go out in a few
+    # writes; utf-8 keeps app names intact whatever the platform default is
+    with open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        write_template(f, fields)
     
-    with open(output_file, 'w') as f:
-        f.write(html)
+    if cached_file is not None:
+        _store_cached_dashboard(output_file, cached_file)
     
     print(f"✅ Dashboard generated: {output_file}")
     return output_file
@@ -553,19 +747,25 @@ def generate_dashboard(json_file: str, output_file: str = None):
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python3 generate_dora_dashboard.py <report.json> [output.html]")
+        print("Usage: python3 generate_dora_dashboard.py <report.json> [output.html] [stylesheet.css]")
         print("\nExample:")
         print("  python3 generate_dora_dashboard.py dora_report_production_20260115.json")
+        print("  python3 generate_dora_dashboard.py report.json report.html dashboard.css  # shared stylesheet")
         sys.exit(1)
     
     json_file = sys.argv[1]
     output_file = sys.argv[2] if len(sys.argv) > 2 else None
+    css_href = sys.argv[3] if len(sys.argv) > 3 else None
     
     if not Path(json_file).exists():
         print(f"❌ Error: File not found: {json_file}")
         sys.exit(1)
     
-    generate_dashboard(json_file, output_file)
+    try:
+        generate_dashboard(json_file, output_file, css_href)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
 
 
 if __name__ == '__main__':